@@ -14,51 +14,92 @@ Requires:
     - ANTHROPIC_API_KEY environment variable set
 """
 
+from __future__ import annotations
+
+import argparse
 import asyncio
+import collections
+import contextlib
+import dataclasses
+import functools
+import json
+import re
 import sys
 import os
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+# claude_agent_sdk (and dotenv) are imported where they are used, so --help,
+# usage errors and argument parsing never pay for loading the SDK.
+if TYPE_CHECKING:
+    from claude_agent_sdk import (
+        AgentDefinition,
+        AssistantMessage,
+        ClaudeAgentOptions,
+        ClaudeSDKClient,
+        ResultMessage,
+    )
 
-from dotenv import load_dotenv
-from claude_agent_sdk import (
-    query,
-    ClaudeAgentOptions,
-    AgentDefinition,
-    AssistantMessage,
-    TextBlock,
-    ToolUseBlock,
-    ResultMessage,
-    CLINotFoundError,
-    ProcessError,
-    CLIJSONDecodeError,
-)
+# Project root is one level up from agents/ (resolved by _bootstrap)
+PROJECT_ROOT = str(Path(__file__).parent.parent)
 
-# Load .env from the agents directory
-load_dotenv(Path(__file__).parent / ".env")
+# ─── Bootstrap ────────────────────────────────────────────────────────────────
+# Blocking setup that must happen before the first LLM call. Each step runs in
+# a worker thread and they are gathered together, so further pre-LLM reads
+# (session history, XER metadata) can be added here without stacking latency.
+
+_bootstrapped = False
+
+
+def _load_env() -> None:
+    """Load .env from the agents directory."""
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).parent / ".env")
+
+
+def _resolve_project_root() -> str:
+    """Resolve the project root to an absolute, symlink-free path."""
+    return str(Path(__file__).resolve().parent.parent)
+
+
+async def _bootstrap() -> None:
+    """Run pre-LLM setup once per process."""
+    global _bootstrapped, PROJECT_ROOT
+
+    if _bootstrapped:
+        return
+    _, PROJECT_ROOT = await asyncio.gather(
+        asyncio.to_thread(_load_env),
+        asyncio.to_thread(_resolve_project_root),
+    )
+    _bootstrapped = True
 
-# Project root is one level up from agents/
-PROJECT_ROOT = str(Path(__file__).parent.parent)
 
 # ─── Agent Definitions ───────────────────────────────────────────────────────
 
-UX_AGENT = AgentDefinition(
-    description=(
-        "UX/UI specialist for CRUNCH. Use this agent for tasks involving "
-        "visual design, layout, styling, CSS, component structure, responsive "
-        "design, accessibility, user interactions, color schemes, typography, "
-        "tooltips, animations, and any front-end presentation concerns. "
-        "This agent understands React component patterns and Recharts "
-        "chart customization."
-    ),
-    prompt="""You are the UX/UI specialist for CRUNCH, a React-based schedule compression
-cost forecasting tool for heavy industrial construction projects.
-
-## Project Context
+# Shared by all three specialists and placed first in each prompt, so every
+# specialist prompt opens with a byte-identical leading section.
+SHARED_PROJECT_CONTEXT = """## Project Context
+CRUNCH is a React-based schedule compression cost forecasting tool for heavy
+industrial construction projects.
 - Single-file React app: cost_forecast.jsx (~6,900 lines)
 - Runs in-browser via Babel standalone + CDN (React 18, Recharts 2)
+- No build step and no test framework yet
+- Parses Primavera P6 XER files (tab-delimited, multi-table format)
+- Implements CPM (Critical Path Method) with forward and backward passes
+- Models overtime cost impacts using industry-standard references
+- Test data: XER files from Primavera P6 (real construction schedules)
+- Dev server: node serve.js (port 3000)"""
+
+UX_EXPERTISE = """You are the UX/UI specialist for CRUNCH.
+
+## UI Conventions
 - Dark theme UI with amber (#f59e0b) accents
 - Fonts: Barlow Condensed (display), JetBrains Mono (data/code)
-- No build step — all styling is inline React style objects
+- All styling is inline React style objects
 
 ## Your Expertise
 - React component architecture and composition patterns
@@ -88,28 +129,30 @@ cost forecasting tool for heavy industrial construction projects.
 - Consider both wide desktop (1920px) and laptop (1366px) viewports
 
 When making changes, read the relevant section of cost_forecast.jsx first to
-understand the current implementation before proposing modifications.""",
-    tools=["Read", "Edit", "Write", "Grep", "Glob"],
-    model="sonnet",
-)
+understand the current implementation before proposing modifications."""
+
+
+@functools.cache
+def get_ux_agent() -> AgentDefinition:
+    """The UX/UI specialist definition."""
+    from claude_agent_sdk import AgentDefinition
+
+    return AgentDefinition(
+        description=(
+            "UX/UI specialist for CRUNCH. Use this agent for tasks involving "
+            "visual design, layout, styling, CSS, component structure, responsive "
+            "design, accessibility, user interactions, color schemes, typography, "
+            "tooltips, animations, and any front-end presentation concerns. "
+            "This agent understands React component patterns and Recharts "
+            "chart customization."
+        ),
+        prompt=f"{SHARED_PROJECT_CONTEXT}\n\n{UX_EXPERTISE}",
+        tools=["Read", "Edit", "Write", "Grep", "Glob"],
+        model="sonnet",
+    )
 
-MODELING_AGENT = AgentDefinition(
-    description=(
-        "Modeling and algorithm specialist for CRUNCH. Use this agent for tasks "
-        "involving CPM scheduling logic, forward/backward pass calculations, "
-        "float computation, schedule crashing algorithms, cost modeling, "
-        "MCAA OT fatigue tables, trade stacking penalties, productivity factors, "
-        "XER file parsing, P6 schedule data, hours aggregation, S-curve "
-        "generation, and any mathematical or engineering formula work."
-    ),
-    prompt="""You are the Modeling & Algorithm specialist for CRUNCH, a schedule compression
-cost forecasting tool for heavy industrial construction projects.
-
-## Project Context
-- Single-file React app: cost_forecast.jsx (~6,900 lines)
-- Parses Primavera P6 XER files (tab-delimited, multi-table format)
-- Implements CPM (Critical Path Method) with forward and backward passes
-- Models overtime cost impacts using industry-standard references
+
+MODELING_EXPERTISE = """You are the Modeling & Algorithm specialist for CRUNCH.
 
 ## Your Expertise
 - **CPM Engine**: Forward pass (early start/finish), backward pass (late start/finish, total float)
@@ -120,17 +163,6 @@ cost forecasting tool for heavy industrial construction projects.
 - **XER Parsing**: TASK, TASKPRED, TASKRSRC, RSRC, CALENDAR, PROJECT tables
 - **Hours Aggregation**: Weekly hour rollups, S-curve generation, cumulative cost tracking
 
-## Key Functions You Maintain
-1. `parseXER(text)` — XER file parser (~line 35-160)
-2. `buildSchedule(parsed, projectId)` — Schedule builder (~line 160-340)
-3. `topoSort(tasks, relationships)` — Topological sort for CPM (~line 340-390)
-4. `getMinWeeksCPM(schedule)` — Minimum achievable duration (~line 390-440)
-5. `runForwardPass(sorted, taskMap, predecessors)` — CPM forward pass (~line 584)
-6. `runBackwardPass(sorted, taskMap, successors)` — CPM backward pass (~line 609)
-7. `compressByCPM(schedule, targetWeeks, baseWeeks, otMode)` — Float-aware crashing (~line 658)
-8. `computeScenario(schedule, weeks, otMode)` — Full cost scenario computation
-9. OT fatigue tables and trade stacking penalty curves
-
 ## Algorithm Details — Float-Aware Crashing (compressByCPM)
 The compression uses a 4-phase approach:
 - **Phase 1**: CPM at original durations — forward + backward pass for dynamic float
@@ -152,27 +184,41 @@ Key constraints:
 - Hours data aggregates to weekly buckets aligned to calendar week boundaries
 
 When making changes, always verify the algorithm against the relationship type
-constraint equations and ensure backward pass mirrors forward pass correctly.""",
-    tools=["Read", "Edit", "Write", "Grep", "Glob", "Bash"],
-    model="sonnet",
-)
+constraint equations and ensure backward pass mirrors forward pass correctly."""
 
-QA_AGENT = AgentDefinition(
-    description=(
-        "QA and testing specialist for CRUNCH. Use this agent for tasks involving "
-        "test scenario design, edge case identification, regression testing, "
-        "manual test plans, data validation, XER test file analysis, "
-        "performance profiling, bug investigation, error reproduction, "
-        "cross-browser testing strategies, and quality assurance reviews."
-    ),
-    prompt="""You are the QA & Testing specialist for CRUNCH, a React-based schedule compression
-cost forecasting tool for heavy industrial construction projects.
-
-## Project Context
-- Single-file React app: cost_forecast.jsx (~6,900 lines)
-- Runs in-browser via Babel standalone (no build step, no test framework yet)
-- Test data: XER files from Primavera P6 (real construction schedules)
-- Dev server: node serve.js (port 3000)
+MODELING_KEY_FUNCTIONS = """## Key Functions You Maintain
+1. `parseXER(text)` — XER file parser (~line 35-160)
+2. `buildSchedule(parsed, projectId)` — Schedule builder (~line 160-340)
+3. `topoSort(tasks, relationships)` — Topological sort for CPM (~line 340-390)
+4. `getMinWeeksCPM(schedule)` — Minimum achievable duration (~line 390-440)
+5. `runForwardPass(sorted, taskMap, predecessors)` — CPM forward pass (~line 584)
+6. `runBackwardPass(sorted, taskMap, successors)` — CPM backward pass (~line 609)
+7. `compressByCPM(schedule, targetWeeks, baseWeeks, otMode)` — Float-aware crashing (~line 658)
+8. `computeScenario(schedule, weeks, otMode)` — Full cost scenario computation
+9. OT fatigue tables and trade stacking penalty curves"""
+
+
+@functools.cache
+def get_modeling_agent() -> AgentDefinition:
+    """The Modeling & Algorithm specialist definition."""
+    from claude_agent_sdk import AgentDefinition
+
+    return AgentDefinition(
+        description=(
+            "Modeling and algorithm specialist for CRUNCH. Use this agent for tasks "
+            "involving CPM scheduling logic, forward/backward pass calculations, "
+            "float computation, schedule crashing algorithms, cost modeling, "
+            "MCAA OT fatigue tables, trade stacking penalties, productivity factors, "
+            "XER file parsing, P6 schedule data, hours aggregation, S-curve "
+            "generation, and any mathematical or engineering formula work."
+        ),
+        prompt=f"{SHARED_PROJECT_CONTEXT}\n\n{MODELING_EXPERTISE}\n\n{MODELING_KEY_FUNCTIONS}",
+        tools=["Read", "Edit", "Write", "Grep", "Glob", "Bash"],
+        model="sonnet",
+    )
+
+
+QA_EXPERTISE = """You are the QA & Testing specialist for CRUNCH.
 
 ## Your Expertise
 - Test scenario design for CPM scheduling algorithms
@@ -215,14 +261,53 @@ cost forecasting tool for heavy industrial construction projects.
 - Document reproduction steps for any bugs found
 
 When investigating issues, start by reading the relevant code section to
-understand the intended behavior before checking actual behavior.""",
-    tools=["Read", "Grep", "Glob", "Bash"],
-    model="sonnet",
-)
+understand the intended behavior before checking actual behavior."""
+
+
+@functools.cache
+def get_qa_agent() -> AgentDefinition:
+    """The QA & Testing specialist definition."""
+    from claude_agent_sdk import AgentDefinition
+
+    return AgentDefinition(
+        description=(
+            "QA and testing specialist for CRUNCH. Use this agent for tasks involving "
+            "test scenario design, edge case identification, regression testing, "
+            "manual test plans, data validation, XER test file analysis, "
+            "performance profiling, bug investigation, error reproduction, "
+            "cross-browser testing strategies, and quality assurance reviews."
+        ),
+        prompt=f"{SHARED_PROJECT_CONTEXT}\n\n{QA_EXPERTISE}",
+        tools=["Read", "Grep", "Glob", "Bash"],
+        model="sonnet",
+    )
+
+
+# CLI short name → (subagent name, definition factory)
+SPECIALISTS = {
+    "ux": ("ux-specialist", get_ux_agent),
+    "modeling": ("modeling-specialist", get_modeling_agent),
+    "qa": ("qa-specialist", get_qa_agent),
+}
+
+
+def get_agent(agent_name: str) -> AgentDefinition:
+    """Definition for a specialist by CLI short name."""
+    return SPECIALISTS[agent_name][1]()
+
+
+@functools.cache
+def team_agents() -> dict[str, AgentDefinition]:
+    """Subagent name → definition, as handed to the PM orchestrator."""
+    return {name: factory() for name, factory in SPECIALISTS.values()}
+
 
 # ─── PM Orchestrator System Prompt ────────────────────────────────────────────
+# Sections are ordered from most to least stable. The CLI receives the prompt
+# as one string with a single cache breakpoint at its end, so per-session
+# context belongs in the user turn, never in here.
 
-PM_SYSTEM_PROMPT = """You are the Project Manager (PM) orchestrator for the CRUNCH development team.
+PM_ROLE = """You are the Project Manager (PM) orchestrator for the CRUNCH development team.
 
 ## Your Role
 You coordinate a team of three specialist agents to develop and maintain CRUNCH
@@ -237,7 +322,9 @@ forecasts schedule compression costs for heavy industrial construction projects.
 ## How You Work
 - When a user request arrives, analyze it and decide which specialist(s) to delegate to
 - For complex tasks, break them into subtasks and delegate to the appropriate specialists
-- You can delegate to multiple specialists in sequence if a task spans domains
+- If a task spans domains and the parts are independent, issue all of those
+  delegations in the same message so the specialists work concurrently
+- Delegate in sequence only when one specialist needs another's output
 - After specialists complete their work, review the results and synthesize a summary
 - If a task is purely about project coordination or status, handle it yourself
 
@@ -247,64 +334,504 @@ forecasts schedule compression costs for heavy industrial construction projects.
 - **QA tasks**: Test planning, bug investigation, validation, performance, edge cases
 - **Cross-cutting tasks**: Break into parts — e.g., "add a new chart" → modeling (data) + UX (visual) + QA (testing)
 
-## Project Structure
-- Main app: cost_forecast.jsx (~6,900 lines, single-file React app)
-- Dev HTML: index.html (loads JSX via Babel standalone)
-- Dev server: serve.js (node serve.js → localhost:3000)
-- Test data: *.xer files (Primavera P6 schedules)
-- All files are in the project root directory
-
 ## Communication Style
 - Be direct and action-oriented
 - Provide clear status updates after each delegation
 - Flag risks or concerns proactively
 - When tasks are complete, provide a concise summary of what was done"""
 
-# ─── Main Entry Point ─────────────────────────────────────────────────────────
+PM_PROJECT_STRUCTURE = """## Project Structure
+- Main app: cost_forecast.jsx (~6,900 lines, single-file React app)
+- Dev HTML: index.html (loads JSX via Babel standalone)
+- Dev server: serve.js (node serve.js → localhost:3000)
+- Test data: *.xer files (Primavera P6 schedules)
+- All files are in the project root directory"""
 
+PM_SYSTEM_PROMPT = f"{PM_ROLE}\n\n{PM_PROJECT_STRUCTURE}"
 
-async def run_team(prompt: str) -> None:
-    """Run the PM orchestrator with the full agent team."""
 
-    options = ClaudeAgentOptions(
+# ─── Prompt Caching ───────────────────────────────────────────────────────────
+# The system prompts above are static across every turn, so they are sent as
+# cacheable prefixes. The Claude Code CLI places its own cache breakpoint at the
+# end of the system prompt; the helper below keeps that behaviour switched on
+# for the subprocess.
+
+
+# The CLI writes its cache entries with the API's default 5-minute TTL and
+# exposes no switch for the 1-hour TTL, so everything here assumes 5 minutes.
+CLI_CACHE_TTL_SECONDS = 5 * 60
+
+
+def cache_env() -> dict[str, str]:
+    """Environment overrides for the CLI subprocess that keep caching enabled."""
+    # A stray DISABLE_PROMPT_CACHING in the user's shell would silently turn
+    # every turn into a full-price prompt write.
+    return {"DISABLE_PROMPT_CACHING": "0"}
+
+
+# ─── Cache Metrics ────────────────────────────────────────────────────────────
+# A cache that silently stops hitting looks exactly like one that works, so
+# every run reports its hit rate and appends it to a JSONL log for trends.
+
+CACHE_METRICS_PATH = Path(__file__).parent / ".cache_metrics.jsonl"
+LOW_HIT_RATE = 0.5
+LOW_HIT_STREAK_WARN = 3
+
+
+def _low_hit_streak(label: str) -> int:
+    """Count the trailing low-hit sequential runs of an agent in the metrics log.
+
+    Read from disk rather than kept in memory, so one-shot runs (the default
+    mode, --agent) add up across processes too.
+    """
+    recent = collections.deque(maxlen=LOW_HIT_STREAK_WARN)
+    try:
+        with open(CACHE_METRICS_PATH, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("agent") == label and not record.get("concurrent"):
+                    recent.append(record.get("hit_rate") or 0.0)
+    except OSError:
+        return 0
+
+    streak = 0
+    for hit_rate in reversed(recent):
+        if hit_rate >= LOW_HIT_RATE:
+            break
+        streak += 1
+    return streak
+
+
+def report_cache_usage(usage: dict | None, label: str, concurrent: bool = False) -> None:
+    """Print the prompt-cache hit rate for a run and log it to CACHE_METRICS_PATH.
+
+    Runs from a concurrent fan-out (--parallel, --batch) all cold-write the
+    cache at once, so they pass ``concurrent=True`` and never count toward
+    the low-hit-rate warning.
+    """
+    if not usage:
+        return
+    input_tokens = usage.get("input_tokens") or 0
+    cache_read = usage.get("cache_read_input_tokens") or 0
+    cache_write = usage.get("cache_creation_input_tokens") or 0
+    prompt_tokens = input_tokens + cache_read + cache_write
+    hit_rate = cache_read / prompt_tokens if prompt_tokens else 0.0
+
+    print(f"Cache: {hit_rate:.0%} hit ({cache_read} read, {cache_write} write)")
+
+    record = {
+        "ts": time.time(),
+        "agent": label,
+        "concurrent": concurrent,
+        "input_tokens": input_tokens,
+        "cache_read_input_tokens": cache_read,
+        "cache_creation_input_tokens": cache_write,
+        "output_tokens": usage.get("output_tokens") or 0,
+        "hit_rate": round(hit_rate, 4),
+    }
+    try:
+        with open(CACHE_METRICS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        return  # metrics are best-effort
+
+    if not concurrent and _low_hit_streak(label) >= LOW_HIT_STREAK_WARN:
+        print(
+            f"WARNING: cache hit rate below {LOW_HIT_RATE:.0%} for the last "
+            f"{LOW_HIT_STREAK_WARN} {label} runs — the system prompt prefix is "
+            "probably changing between calls."
+        )
+
+
+# ─── Model Routing ────────────────────────────────────────────────────────────
+# Read-only lookups ("list the test files") don't need Sonnet. They are routed
+# to Haiku with a trimmed system prompt. Anything else, and anything for an
+# agent that can edit files, keeps the full prompt on the configured model:
+# the trimmed prompt drops the specialist's guidelines.
+
+SIMPLE_PROMPT_MAX_CHARS = 200
+EDIT_TOOLS = frozenset({"Edit", "Write"})
+_LOOKUP_VERBS_RE = re.compile(r"^\s*(?:list|show|what|where)\b", re.IGNORECASE)
+_FILE_PATH_RE = re.compile(r"[\w-]+\.(?:jsx?|py|html|xer|json|md|txt)\b|\w/\w")
+_COMPLEX_KEYWORDS_RE = re.compile(r"\b(?:refactor|implement|fix|debug)\b", re.IGNORECASE)
+
+
+def classify_complexity(prompt: str) -> Literal["simple", "complex"]:
+    """Cheaply classify a prompt as a simple lookup or a complex task."""
+    if (
+        len(prompt) >= SIMPLE_PROMPT_MAX_CHARS
+        or not _LOOKUP_VERBS_RE.match(prompt)
+        or "```" in prompt
+        or _FILE_PATH_RE.search(prompt)
+        or _COMPLEX_KEYWORDS_RE.search(prompt)
+    ):
+        return "complex"
+    return "simple"
+
+
+def can_edit(agent_def: AgentDefinition) -> bool:
+    """True if the agent has tools that modify files."""
+    return bool(EDIT_TOOLS & set(agent_def.tools or []))
+
+
+def trim_prompt(prompt: str) -> str:
+    """Cut a specialist prompt down to its role and Project Context block."""
+    head, sep, _ = prompt.partition("\n## Your Expertise")
+    return head.rstrip() if sep else prompt
+
+
+# ─── Options & Output ─────────────────────────────────────────────────────────
+
+
+def agent_options(agent_def: AgentDefinition, simple: bool = False) -> ClaudeAgentOptions:
+    """Build options for running a specialist directly, without the PM.
+
+    With ``simple=True`` the specialist runs on Haiku with a trimmed prompt.
+    """
+    from claude_agent_sdk import ClaudeAgentOptions
+
+    return ClaudeAgentOptions(
+        system_prompt=trim_prompt(agent_def.prompt) if simple else agent_def.prompt,
+        allowed_tools=agent_def.tools or [],
+        permission_mode="acceptEdits",
+        cwd=PROJECT_ROOT,
+        model="haiku" if simple else agent_def.model,
+        max_turns=20,
+        env=cache_env(),
+    )
+
+
+def pm_model() -> str | None:
+    """Model override for the PM orchestrator, from CRUNCH_FAST_PM.
+
+    The PM mostly writes short routing and summary turns, where latency is
+    what the user sees; subagents keep their own model regardless.
+    """
+    if os.environ.get("CRUNCH_FAST_PM") == "1":
+        return "haiku"
+    return None
+
+
+def team_options() -> ClaudeAgentOptions:
+    """Build options for the PM orchestrator with the full agent team."""
+    from claude_agent_sdk import ClaudeAgentOptions
+
+    return ClaudeAgentOptions(
         system_prompt=PM_SYSTEM_PROMPT,
+        model=pm_model(),
         # Task is required for subagent delegation
         allowed_tools=["Read", "Grep", "Glob", "Edit", "Write", "Bash", "Task"],
         permission_mode="acceptEdits",
         cwd=PROJECT_ROOT,
         max_turns=50,
-        agents={
-            "ux-specialist": UX_AGENT,
-            "modeling-specialist": MODELING_AGENT,
-            "qa-specialist": QA_AGENT,
-        },
+        env=cache_env(),
+        agents=team_agents(),
     )
 
-    print(f"\n{'='*60}")
-    print("CRUNCH Agent Team")
-    print(f"{'='*60}")
-    print(f"PM Orchestrator coordinating: UX, Modeling, QA")
-    print(f"Project: {PROJECT_ROOT}")
-    print(f"{'='*60}\n")
-    print(f"Task: {prompt}\n")
-    print("-" * 60)
+
+@functools.lru_cache(maxsize=None)
+def get_options(agent_name: str | None = None, simple: bool = False) -> ClaudeAgentOptions:
+    """Shared options for the PM (``agent_name=None``) or a specialist.
+
+    Built once per process on first use (after _bootstrap has loaded .env and
+    resolved PROJECT_ROOT) and reused for every later call, so batch items and
+    REPL turns all send the identical prompt prefix and keep the shared
+    client connected.
+    """
+    if agent_name is None:
+        return team_options()
+    return agent_options(get_agent(agent_name), simple=simple)
+
+
+async def consume(stream) -> list:
+    """Drain a query() message stream into a list."""
+    return [message async for message in stream]
+
+
+def print_sdk_error(e: Exception) -> None:
+    """Print a CLI/SDK failure the way the CLI entry points report it."""
+    from claude_agent_sdk import CLIJSONDecodeError, CLINotFoundError, ProcessError
+
+    if isinstance(e, CLINotFoundError):
+        print("\nERROR: Claude Code CLI not found.")
+        print("Install it with: npm install -g @anthropic-ai/claude-code")
+    elif isinstance(e, ProcessError):
+        print(f"\nERROR: Process failed (exit code {e.exit_code})")
+        if e.stderr:
+            print(f"  {e.stderr}")
+    elif isinstance(e, CLIJSONDecodeError):
+        print(f"\nERROR: Failed to parse SDK response: {e}")
+    else:
+        print(f"\nERROR: {type(e).__name__}: {e}")
+
+
+@contextlib.contextmanager
+def exit_on_sdk_error():
+    """Report a CLI/SDK failure inside the block and exit with status 1."""
+    from claude_agent_sdk import CLIJSONDecodeError, CLINotFoundError, ProcessError
 
     try:
-        async for message in query(prompt=prompt, options=options):
+        yield
+    except (CLINotFoundError, ProcessError, CLIJSONDecodeError) as e:
+        print_sdk_error(e)
+        sys.exit(1)
+
+
+def write_assistant(message: AssistantMessage, show_delegations: bool = False) -> None:
+    """Write an assistant message to stdout as one write and one flush.
+
+    Streaming responses arrive as many small text blocks; joining them avoids
+    a stdout lock and flush per block.
+    """
+    from claude_agent_sdk import TextBlock, ToolUseBlock
+
+    # Task calls issued in the same message are dispatched concurrently by the
+    # CLI, so mark them as a parallel fan-out rather than a sequence.
+    task_count = sum(
+        1 for block in message.content
+        if isinstance(block, ToolUseBlock) and block.name == "Task"
+    )
+    verb = "Delegating in parallel to" if task_count > 1 else "Delegating to"
+
+    parts = []
+    for block in message.content:
+        if isinstance(block, TextBlock):
+            parts.append(block.text)
+        elif show_delegations and isinstance(block, ToolUseBlock) and block.name == "Task":
+            agent_type = block.input.get("subagent_type", "unknown")
+            description = block.input.get("description", "")
+            parts.append(f"\n>>> {verb} {agent_type}: {description}\n")
+    parts.append("\n")  # newline after message
+    sys.stdout.write("".join(parts))
+    sys.stdout.flush()
+
+
+def print_messages(messages: list, label: str) -> None:
+    """Print a drained message list from a concurrent run.
+
+    Shows the assistant text, then the result summary.
+    """
+    from claude_agent_sdk import AssistantMessage, ResultMessage
+
+    for message in messages:
+        if isinstance(message, AssistantMessage):
+            write_assistant(message)
+
+        if isinstance(message, ResultMessage):
+            print("\n" + "-" * 60)
+            if message.is_error:
+                print(f"ERROR: {message.result}")
+            else:
+                print("Task completed successfully.")
+            if message.total_cost_usd is not None:
+                print(f"Cost: ${message.total_cost_usd:.4f}")
+            report_cache_usage(message.usage, label, concurrent=True)
+
+
+def print_fanout(items: list[tuple[str, str, list | BaseException]]) -> int:
+    """Print each concurrent item's messages, or its error, under its header.
+
+    Items are (header, agent label, gather result) triples; a failed item does
+    not hide the others' output. Returns the number of items that failed.
+    """
+    failed = 0
+    for header, label, result in items:
+        if not isinstance(result, (list, Exception)):
+            raise result  # cancellation / KeyboardInterrupt
+        print(f"\n>>> {header}\n")
+        if isinstance(result, Exception):
+            print_sdk_error(result)
+            failed += 1
+        else:
+            print_messages(result, label)
+    return failed
+
+
+# ─── Direct API Fast Path ─────────────────────────────────────────────────────
+# A question about a read-only specialist's own remit ("what relationship types
+# do you test?") is answered from its system prompt alone, so it goes straight
+# to the Messages API and skips the CLI subprocess. Anything that might need to
+# look at the code goes through the CLI and its tools. Requires
+# ANTHROPIC_API_KEY in the environment.
+
+# CLI model aliases → Messages API model names
+API_MODELS = {
+    "haiku": "claude-haiku-4-5",
+    "sonnet": "claude-sonnet-4-5",
+    "opus": "claude-opus-4-1",
+}
+
+_DIRECT_QUESTION_RE = re.compile(r"^\s*(?:what|which)\b", re.IGNORECASE)
+_CODE_TERMS_RE = re.compile(
+    r"\b(?:code|files?|functions?|lines?|components?|bugs?|errors?|"
+    r"parser|implementation|currently|jsx|xer)\b",
+    re.IGNORECASE,
+)
+
+
+def can_use_direct_api(agent_def: AgentDefinition, prompt: str) -> bool:
+    """True if the prompt can be answered without the CLI's tool loop."""
+    return (
+        bool(os.environ.get("ANTHROPIC_API_KEY"))
+        and not can_edit(agent_def)
+        and len(prompt) < SIMPLE_PROMPT_MAX_CHARS
+        and bool(_DIRECT_QUESTION_RE.match(prompt))
+        and not _CODE_TERMS_RE.search(prompt)
+        and not _FILE_PATH_RE.search(prompt)
+    )
+
+
+async def _direct_api(system: str, prompt: str, model: str) -> str:
+    """Stream a single Messages API turn to stdout and return its text."""
+    import anthropic
+
+    # No cache_control: the specialist prompts are well below the API's
+    # minimum cacheable length, so a breakpoint would never be written.
+    client = anthropic.AsyncAnthropic()
+    async with client.messages.stream(
+        model=API_MODELS.get(model, model),
+        max_tokens=4096,
+        system=system,
+        messages=[{"role": "user", "content": prompt}],
+    ) as stream:
+        async for text in stream.text_stream:
+            print(text, end="", flush=True)
+        return await stream.get_final_text()
+
+
+# ─── Persistent Client ────────────────────────────────────────────────────────
+# Every query() call spawns a fresh `claude` CLI subprocess. The shared client
+# below keeps one subprocess (and its conversation) alive for as long as the
+# options don't change, so REPL turns and repeat calls skip the spin-up.
+
+_client: ClaudeSDKClient | None = None
+_client_options: ClaudeAgentOptions | None = None
+
+# Tools whose use means a run may already have changed something
+SIDE_EFFECT_TOOLS = EDIT_TOOLS | {"Bash", "Task"}
+
+# Set once the current run_once() run has called one of SIDE_EFFECT_TOOLS
+_side_effects_started = False
+
+
+async def send(prompt: str, options: ClaudeAgentOptions):
+    """Send a prompt over the shared client and yield the response messages."""
+    global _client, _client_options, _side_effects_started
+
+    from claude_agent_sdk import AssistantMessage, ClaudeSDKClient, ToolUseBlock
+
+    if _client is not None and _client_options != options:
+        await close_client()
+    if _client is None:
+        client = ClaudeSDKClient(options=options)
+        await client.connect()
+        _client, _client_options = client, options
+
+    await _client.query(prompt)
+    async for message in _client.receive_response():
+        if isinstance(message, AssistantMessage) and any(
+            isinstance(block, ToolUseBlock) and block.name in SIDE_EFFECT_TOOLS
+            for block in message.content
+        ):
+            _side_effects_started = True
+        yield message
+
+
+def side_effects_started() -> bool:
+    """Whether the current run_once() run has called an editing or delegating tool."""
+    return _side_effects_started
+
+
+async def close_client() -> None:
+    """Disconnect the shared client, if one is open."""
+    global _client, _client_options
+
+    if _client is not None:
+        client, _client, _client_options = _client, None, None
+        await client.disconnect()
+
+
+# ─── Cache Warming ────────────────────────────────────────────────────────────
+# In the REPL the cached prefix would expire while the user is idle, and the
+# next real prompt would pay for the cache write. A one-turn "ok" query writes
+# (then keeps refreshing) the cache in the background instead. Each refresh is
+# a full PM turn: the prefix is billed at the cache-read rate, but the reply's
+# output tokens are not, so an idle REPL still costs a little every few minutes.
+
+# Refresh a little before the CLI's (5-minute) cache TTL runs out
+CACHE_REFRESH_SECONDS = CLI_CACHE_TTL_SECONDS - 60
+
+# Stop refreshing once the REPL has sat idle this long
+CACHE_WARM_MAX_IDLE_SECONDS = 30 * 60
+
+# REPL turn state read by the warmer: when the last real turn finished
+# (time.monotonic(), None before the first one) and whether one is running
+_last_turn_at: float | None = None
+_turn_active = False
+
+
+async def _warm_cache(options: ClaudeAgentOptions) -> None:
+    """Send a throwaway one-turn prompt so the system prompt prefix is cached."""
+    from claude_agent_sdk import query
+
+    try:
+        await consume(query(prompt="ok", options=dataclasses.replace(options, max_turns=1)))
+    except Exception:
+        pass  # warming is best-effort; the real query will write the cache
+
+
+async def _keep_cache_warm(options: ClaudeAgentOptions) -> None:
+    """Refresh the cache before each TTL expiry while the REPL is idle.
+
+    A real turn keeps the prefix cached by itself, so no refresh is sent
+    while one runs or within CACHE_REFRESH_SECONDS of one finishing. After
+    CACHE_WARM_MAX_IDLE_SECONDS without a turn, refreshing pauses until the
+    next one.
+    """
+    started = time.monotonic()
+    while True:
+        delay = CACHE_REFRESH_SECONDS
+        idle = time.monotonic() - (_last_turn_at or started)
+        if _turn_active:
+            pass
+        elif _last_turn_at is not None and idle < CACHE_REFRESH_SECONDS:
+            delay = CACHE_REFRESH_SECONDS - idle
+        elif idle < CACHE_WARM_MAX_IDLE_SECONDS:
+            await _warm_cache(options)
+        await asyncio.sleep(delay)
+
+
+# ─── Main Entry Point ─────────────────────────────────────────────────────────
+
+
+async def run_team(prompt: str, show_banner: bool = True) -> ResultMessage | None:
+    """Run the PM orchestrator with the full agent team.
+
+    Returns the final ResultMessage, or None if the run produced none.
+    """
+    from claude_agent_sdk import AssistantMessage, ResultMessage
+
+    await _bootstrap()
+    options = get_options()
+
+    if show_banner:
+        print_team_banner()
+        print(f"Task: {prompt}\n")
+        print("-" * 60)
+
+    result = None
+    with exit_on_sdk_error():
+        async for message in send(prompt, options):
             # Print assistant text responses
             if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        print(block.text, end="")
-                    elif isinstance(block, ToolUseBlock):
-                        if block.name == "Task":
-                            agent_type = block.input.get("subagent_type", "unknown")
-                            description = block.input.get("description", "")
-                            print(f"\n>>> Delegating to {agent_type}: {description}")
-                print()  # newline after message
+                write_assistant(message, show_delegations=True)
 
             # Print final result
             if isinstance(message, ResultMessage):
+                result = message
                 print("\n" + "-" * 60)
                 if message.is_error:
                     print(f"ERROR: {message.result}")
@@ -312,62 +839,132 @@ async def run_team(prompt: str) -> None:
                     print("Task completed successfully.")
                 if message.total_cost_usd is not None:
                     print(f"Cost: ${message.total_cost_usd:.4f}")
+                report_cache_usage(message.usage, "pm")
                 print(f"Duration: {message.duration_ms / 1000:.1f}s")
                 print(f"Turns: {message.num_turns}")
-    except CLINotFoundError:
-        print("\nERROR: Claude Code CLI not found.")
-        print("Install it with: npm install -g @anthropic-ai/claude-code")
-        sys.exit(1)
-    except ProcessError as e:
-        print(f"\nERROR: Process failed (exit code {e.exit_code})")
-        if e.stderr:
-            print(f"  {e.stderr}")
-        sys.exit(1)
-    except CLIJSONDecodeError as e:
-        print(f"\nERROR: Failed to parse SDK response: {e}")
-        sys.exit(1)
+    return result
 
 
-async def run_single_agent(agent_name: str, prompt: str) -> None:
-    """Run a single specialist agent directly (bypass PM)."""
+def print_team_banner() -> None:
+    """Print the PM orchestrator banner."""
+    print(f"\n{'='*60}")
+    print("CRUNCH Agent Team")
+    print(f"{'='*60}")
+    print(f"PM Orchestrator coordinating: UX, Modeling, QA")
+    if pm_model():
+        print(f"PM model: {pm_model()} (CRUNCH_FAST_PM)")
+    print(f"Project: {PROJECT_ROOT}")
+    print(f"{'='*60}\n")
 
-    agents_map = {
-        "ux": ("ux-specialist", UX_AGENT),
-        "modeling": ("modeling-specialist", MODELING_AGENT),
-        "qa": ("qa-specialist", QA_AGENT),
-    }
 
-    if agent_name not in agents_map:
-        print(f"Unknown agent: {agent_name}")
-        print(f"Available: {', '.join(agents_map.keys())}")
-        return
+async def _ainput(prompt: str) -> str:
+    """input() on a daemon thread, so background tasks run while waiting."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
 
-    name, agent_def = agents_map[agent_name]
+    def settle(setter, value) -> None:
+        if not future.done():
+            setter(value)
 
-    options = ClaudeAgentOptions(
-        system_prompt=agent_def.prompt,
-        allowed_tools=agent_def.tools or [],
-        permission_mode="acceptEdits",
-        cwd=PROJECT_ROOT,
-        model=agent_def.model,
-        max_turns=20,
-    )
+    def read() -> None:
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(settle, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(settle, future.set_result, line)
+
+    # A daemon thread, unlike the default executor, never blocks shutdown
+    # when Ctrl-C arrives mid-prompt.
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+async def run_interactive() -> None:
+    """Run a PM session that keeps one client and conversation across prompts."""
+    global _last_turn_at, _turn_active
+
+    await _bootstrap()
+
+    print_team_banner()
+    print("Type a task and press Enter. 'exit' or Ctrl-D to quit.")
+
+    # The first warm-up overlaps with the user typing their first prompt
+    warmer = asyncio.create_task(_keep_cache_warm(get_options()))
+    try:
+        while True:
+            try:
+                prompt = (await _ainput("\ncrunch> ")).strip()
+            except EOFError:
+                print()
+                break
+            if prompt.lower() in ("exit", "quit"):
+                break
+            if prompt:
+                print("-" * 60)
+                _turn_active = True
+                try:
+                    await run_team(prompt, show_banner=False)
+                finally:
+                    _turn_active = False
+                    _last_turn_at = time.monotonic()
+    finally:
+        warmer.cancel()
+        await close_client()
+
+
+async def run_single_agent(agent_name: str, prompt: str) -> ResultMessage | str | None:
+    """Run a single specialist agent directly (bypass PM).
+
+    Returns the final ResultMessage, or the answer text if the prompt was
+    served by the direct API path.
+    """
+    from claude_agent_sdk import AssistantMessage, ResultMessage
+
+    await _bootstrap()
+
+    if agent_name not in SPECIALISTS:
+        print(f"Unknown agent: {agent_name}")
+        print(f"Available: {', '.join(SPECIALISTS.keys())}")
+        return None
+
+    name = SPECIALISTS[agent_name][0]
+    agent_def = get_agent(agent_name)
+    simple = not can_edit(agent_def) and classify_complexity(prompt) == "simple"
+    direct = can_use_direct_api(agent_def, prompt)
+    options = get_options(agent_name, simple=simple)
 
     print(f"\n{'='*60}")
     print(f"CRUNCH — {name}")
     print(f"{'='*60}\n")
+    if direct:
+        print("Model: haiku (direct API, no tools)\n")
+    elif simple:
+        print("Model: haiku (simple task fast path)\n")
     print(f"Task: {prompt}\n")
     print("-" * 60)
 
-    try:
-        async for message in query(prompt=prompt, options=options):
+    if direct:
+        import anthropic
+
+        try:
+            # Full prompt: the answer has to come from it, not from the code
+            text = await _direct_api(agent_def.prompt, prompt, "haiku")
+        except anthropic.APIError as e:
+            print(f"\nERROR: API request failed: {e}")
+            sys.exit(1)
+        print("\n" + "-" * 60)
+        print("Task completed successfully.")
+        return text
+
+    result = None
+    with exit_on_sdk_error():
+        async for message in send(prompt, options):
             if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        print(block.text, end="")
-                print()
+                write_assistant(message)
 
             if isinstance(message, ResultMessage):
+                result = message
                 print("\n" + "-" * 60)
                 if message.is_error:
                     print(f"ERROR: {message.result}")
@@ -375,20 +972,161 @@ async def run_single_agent(agent_name: str, prompt: str) -> None:
                     print("Task completed successfully.")
                 if message.total_cost_usd is not None:
                     print(f"Cost: ${message.total_cost_usd:.4f}")
-    except CLINotFoundError:
-        print("\nERROR: Claude Code CLI not found.")
-        print("Install it with: npm install -g @anthropic-ai/claude-code")
-        sys.exit(1)
-    except ProcessError as e:
-        print(f"\nERROR: Process failed (exit code {e.exit_code})")
-        if e.stderr:
-            print(f"  {e.stderr}")
+                report_cache_usage(message.usage, agent_name)
+    return result
+
+
+async def run_team_parallel(subtasks: list[tuple[str, str]]) -> None:
+    """Run independent specialist subtasks concurrently (bypass PM).
+
+    Each subtask is an (agent name, prompt) pair. Every query() gets its own
+    CLI subprocess, so the specialists share nothing but the cached prompts.
+    At most one subtask may use a specialist that can edit files: concurrent
+    editors would race on cost_forecast.jsx (the same rule as run_batch).
+    Use run_team for work where one specialist depends on another's output.
+    """
+    from claude_agent_sdk import query
+
+    await _bootstrap()
+
+    unknown = [agent for agent, _ in subtasks if agent not in SPECIALISTS]
+    if unknown:
+        print(f"Unknown agent: {', '.join(unknown)}")
+        print(f"Available: {', '.join(SPECIALISTS.keys())}")
+        return
+    editors = [agent for agent, _ in subtasks if can_edit(get_agent(agent))]
+    if len(editors) > 1:
+        print(f"ERROR: --parallel allows one editing specialist; got {', '.join(editors)}.")
+        print("Run the editing subtasks one after another, or through the PM.")
+        return
+
+    print(f"\n{'='*60}")
+    print("CRUNCH — Parallel Specialists")
+    print(f"{'='*60}\n")
+    for agent, task in subtasks:
+        print(f"  {SPECIALISTS[agent][0]}: {task}")
+    print("\n" + "-" * 60)
+
+    results = await asyncio.gather(
+        *(consume(query(prompt=task, options=get_options(agent))) for agent, task in subtasks),
+        return_exceptions=True,
+    )
+
+    # Print each specialist's output as one block so streams don't interleave.
+    # A failed subtask must not hide what the others already changed.
+    failed = print_fanout([
+        (SPECIALISTS[agent][0], agent, result)
+        for (agent, _), result in zip(subtasks, results)
+    ])
+    if failed:
+        print(f"\n{failed} of {len(subtasks)} subtasks failed.")
         sys.exit(1)
-    except CLIJSONDecodeError as e:
-        print(f"\nERROR: Failed to parse SDK response: {e}")
+
+
+async def run_batch(
+    prompts: list[str],
+    agent_name: str = "qa",
+    max_concurrency: int = 5,
+) -> None:
+    """Run many independent prompts concurrently, e.g. for QA regression sweeps.
+
+    Every item uses the same specialist options, and so the same cached
+    system prompt. Only specialists that cannot edit files are allowed:
+    concurrent editors would race on cost_forecast.jsx. At most
+    ``max_concurrency`` CLI subprocesses run at once.
+    """
+    from claude_agent_sdk import query
+
+    await _bootstrap()
+
+    if agent_name not in SPECIALISTS:
+        print(f"Unknown agent: {agent_name}")
+        print(f"Available: {', '.join(SPECIALISTS.keys())}")
+        return
+    if can_edit(get_agent(agent_name)):
+        print(f"ERROR: --batch needs a read-only specialist; {agent_name} can edit files.")
+        return
+
+    name = SPECIALISTS[agent_name][0]
+    options = get_options(agent_name)
+
+    print(f"\n{'='*60}")
+    print(f"CRUNCH — Batch ({len(prompts)} prompts, {name})")
+    print(f"{'='*60}\n")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_item(prompt: str) -> list:
+        async with semaphore:
+            return await consume(query(prompt=prompt, options=options))
+
+    results = await asyncio.gather(
+        *(run_item(prompt) for prompt in prompts), return_exceptions=True
+    )
+
+    failed = print_fanout([
+        (f"[{i}/{len(prompts)}] {prompt}", agent_name, result)
+        for i, (prompt, result) in enumerate(zip(prompts, results), 1)
+    ])
+    if failed:
+        print(f"\n{failed} of {len(prompts)} prompts failed.")
         sys.exit(1)
 
 
+def read_batch_file(path: str) -> list[str]:
+    """Read one prompt per non-blank line."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+async def run_once(coro):
+    """Await a one-shot run, then disconnect the shared client."""
+    global _side_effects_started
+
+    _side_effects_started = False
+    try:
+        return await coro
+    finally:
+        await close_client()
+
+
+def submit_task(prompt: str, mode: str = "team") -> None:
+    """Queue a run on the Celery worker (see tasks.py) and print its task id."""
+    import uuid
+
+    from tasks import run_agent_task, set_status
+
+    task_id = uuid.uuid4().hex
+    set_status(task_id, status="queued", prompt=prompt, mode=mode, submitted_at=time.time())
+    run_agent_task.apply_async(args=(task_id, prompt, mode), task_id=task_id)
+    print(task_id)
+
+
+def print_task_status(task_id: str) -> None:
+    """Print the status hash of a submitted task."""
+    from tasks import get_status
+
+    status = get_status(task_id)
+    if not status:
+        print(f"Unknown task: {task_id}")
+        return
+    for field in ("status", "mode", "prompt", "attempt", "cost_usd",
+                  "cache_read_tokens", "error", "result"):
+        if status.get(field):
+            print(f"{field}: {status[field]}")
+
+
+def parse_subtasks(spec: str) -> list[tuple[str, str]]:
+    """Parse "ux:task1;;modeling:task2" into (agent, task) pairs."""
+    subtasks = []
+    for part in spec.split(";;"):
+        agent, sep, task = part.partition(":")
+        if not sep or not task.strip():
+            raise ValueError(f"Expected <agent>:<task>, got {part.strip()!r}")
+        subtasks.append((agent.strip(), task.strip()))
+    return subtasks
+
+
 def print_usage():
     """Print usage instructions."""
     print("""
@@ -397,9 +1135,16 @@ CRUNCH Agent Team
 
 Usage:
   python main.py "task description"           Run with PM orchestrator
+  python main.py --interactive                Start a multi-turn PM session
+  python main.py --submit "task"              Queue a PM run on the Celery worker
+  python main.py --submit --agent qa "task"   Queue a specialist run instead
+  python main.py --status <task_id>           Show a queued run's status and result
   python main.py --agent ux "task"            Run UX specialist directly
   python main.py --agent modeling "task"      Run Modeling specialist directly
   python main.py --agent qa "task"            Run QA specialist directly
+  python main.py --parallel "ux:t1;;qa:t2"    Run independent specialist tasks concurrently
+                                              (at most one editing specialist: ux or modeling)
+  python main.py --batch prompts.txt          Run one QA prompt per line concurrently
   python main.py --help                       Show this help
 
 Examples:
@@ -408,34 +1153,86 @@ Examples:
   python main.py --agent qa "Design test cases for the XER parser"
   python main.py --agent ux "Improve the cost summary card layout"
   python main.py --agent modeling "Verify the OT fatigue table interpolation"
+  python main.py --parallel "modeling:Review the FF lag handling;;qa:Design tests for FF lags"
 
 Environment:
   ANTHROPIC_API_KEY    Required. Get one at https://console.anthropic.com/
+  CRUNCH_FAST_PM       Set to 1 to run the PM orchestrator on Haiku for faster turns
+  CRUNCH_REDIS_URL     Broker/status store for --submit (default redis://localhost:6379/0)
 """)
 
 
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser. Help is handled by print_usage()."""
+    parser = argparse.ArgumentParser(prog="main.py", add_help=False)
+    parser.add_argument("-h", "--help", action="store_true")
+    parser.add_argument("--agent", choices=list(SPECIALISTS))
+    parser.add_argument("--batch", metavar="FILE")
+    parser.add_argument("--parallel", metavar="SPEC")
+    parser.add_argument("--interactive", action="store_true")
+    parser.add_argument("--submit", action="store_true")
+    parser.add_argument("--status", metavar="TASK_ID")
+    parser.add_argument("prompt", nargs=argparse.REMAINDER)
+    return parser
+
+
 def main():
     """Parse arguments and run the appropriate agent."""
-    args = sys.argv[1:]
+    args = build_parser().parse_args()
+    prompt = " ".join(args.prompt)
 
-    if not args or "--help" in args or "-h" in args:
+    if args.help or not (
+        prompt or args.batch or args.parallel or args.interactive or args.status
+    ):
         print_usage()
         return
 
+    # Background mode: --status <task_id> polls, --submit [--agent <name>] queues
+    if args.status:
+        print_task_status(args.status)
+        return
+    if args.submit:
+        if not prompt or args.batch or args.parallel or args.interactive:
+            print("Usage: python main.py --submit [--agent <ux|modeling|qa>] \"task\"")
+            return
+        submit_task(prompt, args.agent or "team")
+        return
+
+    # Parallel mode: --parallel "ux:task1;;modeling:task2;;qa:task3"
+    if args.parallel:
+        try:
+            subtasks = parse_subtasks(args.parallel)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            return
+        asyncio.run(run_team_parallel(subtasks))
+        return
+
+    # Batch mode: --batch prompts.txt [--agent qa]
+    if args.batch:
+        try:
+            prompts = read_batch_file(args.batch)
+        except OSError as e:
+            print(f"ERROR: Cannot read batch file: {e}")
+            return
+        asyncio.run(run_batch(prompts, args.agent or "qa"))
+        return
+
     # Direct agent mode: --agent <name> "prompt"
-    if "--agent" in args:
-        idx = args.index("--agent")
-        if idx + 2 > len(args):
+    if args.agent:
+        if not prompt:
             print("Usage: python main.py --agent <ux|modeling|qa> \"task\"")
             return
-        agent_name = args[idx + 1]
-        prompt = " ".join(args[idx + 2:])
-        asyncio.run(run_single_agent(agent_name, prompt))
+        asyncio.run(run_once(run_single_agent(args.agent, prompt)))
+        return
+
+    # Interactive REPL: one client kept alive for the whole session
+    if args.interactive:
+        asyncio.run(run_interactive())
         return
 
     # PM orchestrator mode (default)
-    prompt = " ".join(args)
-    asyncio.run(run_team(prompt))
+    asyncio.run(run_once(run_team(prompt)))
 
 
 if __name__ == "__main__":
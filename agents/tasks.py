@@ -0,0 +1,90 @@
+"""
+CRUNCH Agent Team — Background Tasks
+====================================
+Celery task queue for long-running agent runs. A task is submitted from the
+CLI, executed by a worker, and its status and result are kept in a Redis hash
+so the submitting shell can disconnect and poll later.
+
+Usage:
+    celery -A tasks worker --loglevel=info      (from the agents/ directory)
+    python main.py --submit "Your task description here"
+    python main.py --submit --agent qa "Your task description here"
+    python main.py --status <task_id>
+
+Requires:
+    - Redis reachable at CRUNCH_REDIS_URL (default redis://localhost:6379/0)
+    - celery[redis] installed
+"""
+
+import asyncio
+import os
+import time
+
+import redis
+from celery import Celery
+
+from main import _load_env, run_once, run_single_agent, run_team, side_effects_started
+
+# The worker needs .env (API key, Redis URL) before anything else
+_load_env()
+
+REDIS_URL = os.environ.get("CRUNCH_REDIS_URL", "redis://localhost:6379/0")
+
+# How long task status hashes are kept after the last update
+STATUS_TTL_SECONDS = 7 * 24 * 3600
+
+app = Celery("crunch_agents", broker=REDIS_URL)
+_redis = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+
+
+def status_key(task_id: str) -> str:
+    """Redis key of the status hash for a task."""
+    return f"crunch:task:{task_id}"
+
+
+def set_status(task_id: str, **fields) -> None:
+    """Merge fields into a task's status hash."""
+    key = status_key(task_id)
+    _redis.hset(key, mapping={k: "" if v is None else str(v) for k, v in fields.items()})
+    _redis.expire(key, STATUS_TTL_SECONDS)
+
+
+def get_status(task_id: str) -> dict[str, str]:
+    """Read a task's status hash (empty if unknown or expired)."""
+    return _redis.hgetall(status_key(task_id))
+
+
+@app.task(bind=True, max_retries=3)
+def run_agent_task(self, task_id: str, prompt: str, mode: str = "team") -> None:
+    """Run the PM ("team") or a single specialist and record the outcome."""
+    set_status(task_id, status="running", attempt=self.request.retries + 1, started_at=time.time())
+
+    run = run_team(prompt) if mode == "team" else run_single_agent(mode, prompt)
+    try:
+        # run_team / run_single_agent report CLI failures via sys.exit(1)
+        message = asyncio.run(run_once(run))
+    except (Exception, SystemExit) as e:
+        error = f"{type(e).__name__}: {e}"
+        # Once the run has called Edit, Write, Bash or Task it may already
+        # have changed files, so only failures before that (API overload,
+        # rate limits, CLI start-up) are safe to retry.
+        if side_effects_started() or self.request.retries >= self.max_retries:
+            set_status(task_id, status="failed", error=error, finished_at=time.time())
+            raise RuntimeError(error) from e
+        set_status(task_id, status="retrying", error=error)
+        raise self.retry(exc=RuntimeError(error), countdown=30)
+
+    # The direct API path returns the answer text rather than a ResultMessage
+    if isinstance(message, str):
+        set_status(task_id, status="completed", result=message, finished_at=time.time())
+        return
+
+    usage = (message.usage or {}) if message else {}
+    set_status(
+        task_id,
+        status="failed" if message and message.is_error else "completed",
+        result=message.result if message else "",
+        cost_usd=message.total_cost_usd if message else None,
+        cache_read_tokens=usage.get("cache_read_input_tokens") or 0,
+        finished_at=time.time(),
+    )